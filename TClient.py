@@ -8,7 +8,16 @@ import threading
 import signal
 import json
 import logging
-from typing import Tuple
+import re
+import math
+import random
+import calendar
+import hashlib
+import asyncio
+import shlex
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, Tuple
 
 try:
     import feedparser
@@ -16,10 +25,15 @@ try:
 except ImportError:
     FEEDPARSER_AVAILABLE = False
 
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False # RSS falls back to a thread pool of blocking fetches
+
 try:
     from rich.console import Console
     from rich.table import Table
-    from rich.progress import Progress, BarColumn, TextColumn
     from rich.live import Live
     from rich.prompt import Prompt, Confirm
     from rich.text import Text
@@ -35,7 +49,21 @@ STATE_DIR = os.path.join(os.path.expanduser("~"), ".tclient_state")
 SESSION_STATE_FILE = os.path.join(STATE_DIR, "session.dat")
 RESUME_DATA_DIR = os.path.join(STATE_DIR, "resume")
 RSS_STATE_FILE = os.path.join(STATE_DIR, "rss.json")
+RSS_JOURNAL_FILE = os.path.join(STATE_DIR, "rss.journal")
+RSS_SEEN_FILE = os.path.join(STATE_DIR, "rss_seen.bin") # Concatenated SHA-1 digests of added links
 LOG_FILE = os.path.join(STATE_DIR, "tclient.log")
+RSS_MAX_WORKERS = 8 # Feeds fetched concurrently per RSS cycle (thread-pool fallback only)
+RSS_FETCH_TIMEOUT = 30 # Seconds allowed per feed request with aiohttp
+RSS_MIN_INTERVAL = 5 * 60 # Per-feed poll interval clamps, in seconds
+RSS_MAX_INTERVAL = 24 * 60 * 60
+RSS_RATE_WINDOW = 7 * 24 * 60 * 60 # Window used to measure how often a feed updates
+RSS_JITTER = 60 # Random spread added to each poll so feeds don't sync up
+RSS_COMPACT_EVERY = 500 # Journal records before folding them back into the snapshot
+RESUME_MAX_WORKERS = 8 # Resume files read and parsed concurrently at startup
+C_INT_MAX = 2**31 - 1 # Upper bound for libtorrent int settings
+SHUTDOWN_SAVE_TIMEOUT = 5 # Max seconds to wait for resume data on shutdown
+STATUS_UPDATE_INTERVAL = 0.5 # Seconds between post_torrent_updates() requests
+PROGRESS_BAR_WIDTH = 20 # Fits the 30-char Progress column with the percentage and brackets
 
 # Setup logging
 logging.basicConfig(
@@ -46,45 +74,77 @@ logging.basicConfig(
 )
 
 # --- Helper Functions ---
+def _atomic_write(path: str, data, binary: bool = True):
+    # Write to a sibling temp file and rename over the target, so a crash never leaves a torn file
+    tmp = path + '.tmp'
+    try:
+        with open(tmp, 'wb' if binary else 'w') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp): os.remove(tmp) # Don't leave a half-written temp file behind
+        raise
+
+# (divisor, unit[, decimals]) indexed by bit_length; the formatters below run several times per row per refresh
+_SIZE_UNITS = tuple((1 << (10 * i), u) for i, u in enumerate(("B", "KB", "MB", "GB", "TB")))
+_SPEED_UNITS = ((1, "B/s", 0), (1 << 10, "KB/s", 1), (1 << 20, "MB/s", 2))
+
+# Sizes and rates mostly repeat between frames, so memoize the formatted strings
+@lru_cache(maxsize=1024)
 def human_readable_size(b: int) -> str:
     if b is None: return "N/A"
     if b == 0: return "0B"
-    sz = ("B", "KB", "MB", "GB", "TB")
-    i = int(b).bit_length() // 10
-    p = 1024 ** i
-    s = round(b / p, 2)
-    return f"{s}{sz[i]}"
+    p, unit = _SIZE_UNITS[min(b.bit_length() // 10, len(_SIZE_UNITS) - 1)]
+    return f"{round(b / p, 2)}{unit}"
 
+@lru_cache(maxsize=1024)
 def format_speed(s: float) -> str:
-    if s < 1024: return f"{s:.0f} B/s"
-    if s < 1024**2: return f"{s/1024:.1f} KB/s"
-    return f"{s/1024**2:.2f} MB/s"
-
-def get_status_string(s: lt.torrent_status) -> Tuple[str, str]:
-    if s.paused: return "Paused", "yellow"
-    state_map = {
-        lt.torrent_status.states.checking_files: ("Checking", "yellow"),
-        lt.torrent_status.states.downloading_metadata: ("Metadata", "cyan"),
-        lt.torrent_status.states.downloading: ("Downloading", "blue"),
-        lt.torrent_status.states.finished: ("Completed", "bright_green"),
-        lt.torrent_status.states.seeding: ("Seeding", "green"),
-        lt.torrent_status.states.allocating: ("Allocating", "yellow"),
-    }
-    state_str, color = state_map.get(s.state, ("Unknown", "red"))
+    p, unit, decimals = _SPEED_UNITS[min(max(int(s).bit_length() - 1, 0) // 10, len(_SPEED_UNITS) - 1)]
+    return f"{s / p:.{decimals}f} {unit}"
+
+# Resolved once at import; these are looked up for every row on every UI refresh
+_STATE_MAP = {
+    lt.torrent_status.states.checking_files: ("Checking", "yellow"),
+    lt.torrent_status.states.downloading_metadata: ("Metadata", "cyan"),
+    lt.torrent_status.states.downloading: ("Downloading", "blue"),
+    lt.torrent_status.states.finished: ("Completed", "bright_green"),
+    lt.torrent_status.states.seeding: ("Seeding", "green"),
+    lt.torrent_status.states.allocating: ("Allocating", "yellow"),
+}
+_UNKNOWN = ("Unknown", "red")
+_SS_FLAG = lt.torrent_flags.super_seeding
+_SM_RATIO = lt.share_mode_t.share_mode_ratio
+_SEEDING = lt.torrent_status.states.seeding
+
+def progress_bar(fraction: float) -> str:
+    # Plain string render; building a rich Progress per row per refresh is far more expensive
+    filled = int(fraction * PROGRESS_BAR_WIDTH)
+    return f"{fraction * 100:>5.1f}% [{'█' * filled}{'░' * (PROGRESS_BAR_WIDTH - filled)}]"
+
+def get_status_string(state, flags: int, paused: bool) -> Tuple[str, str]:
+    # Takes plain values so callers read each torrent_status field only once.
+    # Ratio limits are enforced by libtorrent, which pauses or queues the torrent once met.
+    if paused: return "Paused", "yellow"
+    state_str, color = _STATE_MAP.get(state, _UNKNOWN)
     
-    if s.flags & lt.torrent_flags.super_seeding: state_str += " (ss)"
-    if s.share_mode == lt.share_mode_t.share_mode_ratio and s.progress == 1:
-        if s.all_time_upload / s.total_wanted >= s.ratio:
-            state_str = "Ratio Met"
-            color = "magenta"
-
+    if flags & _SS_FLAG: state_str += " (ss)"
     return state_str, color
 
+_NEVER_MATCH = re.compile(r'(?!)') # Stand-in for a stored filter that no longer compiles
+
 class RSSManager:
+    # Per-feed fields that change every poll; journaled instead of rewriting the snapshot
+    SCHEDULE_KEYS = ('next_check_at', 'recent_count', 'etag', 'modified')
+
     def __init__(self, client):
         self.client = client
         self.feeds = []
-        self.history = set()
+        self.seen = set() # SHA-1 digests of links already added; membership is all we need
+        self._journal_len = 0
+        # Journal appends and compaction run on both the RSS and main threads; reentrant since _journal may compact
+        self._state_lock = threading.RLock()
         self.shutdown_event = threading.Event()
         self.thread = threading.Thread(target=self.run, daemon=True)
         self._load_state()
@@ -94,28 +154,83 @@ class RSSManager:
             with open(RSS_STATE_FILE, 'r') as f:
                 state = json.load(f)
                 self.feeds = state.get('feeds', [])
-                self.history = set(state.get('history', []))
+                self.seen.update(map(self._seen_key, state.get('history', []))) # Older state kept raw links
+            for feed in self.feeds:
+                try: feed['_rx'] = re.compile(feed['filter'], re.IGNORECASE)
+                except re.error as e:
+                    logging.error(f"Invalid filter for RSS feed {feed['url']}, feed disabled: {e}")
+                    feed['_rx'] = _NEVER_MATCH
             logging.info("RSS state loaded.")
         except (FileNotFoundError, json.JSONDecodeError):
             logging.warning("No RSS state file found or file is invalid.")
+        try:
+            with open(RSS_SEEN_FILE, 'rb') as f: data = f.read()
+            self.seen.update(data[i:i + 20] for i in range(0, len(data) - len(data) % 20, 20))
+        except FileNotFoundError:
+            pass
+        # Replay changes made since the last snapshot; every record is idempotent
+        torn = False
+        try:
+            with open(RSS_JOURNAL_FILE, 'r') as f:
+                for line in f:
+                    try: record = json.loads(line)
+                    except json.JSONDecodeError: torn = True; break # Torn last line from a crash
+                    self._apply(record)
+                    self._journal_len += 1
+            logging.info(f"RSS journal replayed ({self._journal_len} records).")
+        except FileNotFoundError:
+            pass
+        # New records would be appended straight after the unterminated fragment, so compact now
+        if torn: self._save_state()
+
+    @staticmethod
+    def _seen_key(url: str) -> bytes:
+        return hashlib.sha1(url.encode('utf-8')).digest()
+
+    def _apply(self, record: dict):
+        if 'add' in record: self.seen.add(self._seen_key(record['add']))
+        elif 'sched' in record:
+            for feed in self.feeds:
+                if feed['url'] == record['sched']:
+                    feed.update((k, record.get(k)) for k in self.SCHEDULE_KEYS)
+
+    def _journal(self, records):
+        with self._state_lock:
+            with open(RSS_JOURNAL_FILE, 'a') as f:
+                for record in records: f.write(json.dumps(record) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self._journal_len += len(records)
+            if self._journal_len >= RSS_COMPACT_EVERY: self._save_state()
 
     def _save_state(self):
-        with open(RSS_STATE_FILE, 'w') as f:
-            json.dump({'feeds': self.feeds, 'history': list(self.history)}, f, indent=2)
+        # Full snapshot; once it is on disk the journal is redundant and can be truncated
+        # Keys starting with '_' (e.g. the compiled filter) are runtime-only
+        with self._state_lock:
+            feeds = [{k: v for k, v in feed.items() if not k.startswith('_')} for feed in self.feeds]
+            _atomic_write(RSS_SEEN_FILE, b''.join(self.seen))
+            _atomic_write(RSS_STATE_FILE, json.dumps({'feeds': feeds}, indent=2), binary=False)
+            open(RSS_JOURNAL_FILE, 'w').close()
+            self._journal_len = 0
         logging.info("RSS state saved.")
 
     def add_feed(self, url, regex_filter=".*"):
+        try: rx = re.compile(regex_filter, re.IGNORECASE) # Compiled once here, reused on every poll
+        except re.error as e:
+            self.client.console.print(f"[red]Invalid filter regex: {e}[/]"); return
         if not any(f['url'] == url for f in self.feeds):
-            self.feeds.append({'url': url, 'filter': regex_filter})
-            self._save_state()
+            with self._state_lock:
+                self.feeds.append({'url': url, 'filter': regex_filter, '_rx': rx})
+                self._save_state()
             self.client.console.print(f"[green]RSS feed added:[/] {url}")
         else:
             self.client.console.print("[yellow]Feed URL already exists.[/]")
 
     def remove_feed(self, index: int):
         if 0 <= index < len(self.feeds):
-            removed = self.feeds.pop(index)
-            self._save_state()
+            with self._state_lock:
+                removed = self.feeds.pop(index)
+                self._save_state()
             self.client.console.print(f"[yellow]RSS feed removed:[/] {removed['url']}")
 
     def list_feeds(self):
@@ -132,27 +247,118 @@ class RSSManager:
             logging.error("RSSManager cannot run: `feedparser` library is not installed.")
             return
 
-        while not self.shutdown_event.is_set():
-            logging.info("Checking RSS feeds...")
-            for feed_info in self.feeds:
-                try:
-                    feed = feedparser.parse(feed_info['url'])
-                    import re
-                    for entry in feed.entries:
-                        if re.search(feed_info['filter'], entry.title, re.IGNORECASE):
-                            for link in entry.links:
-                                if link.get('type') == 'application/x-bittorrent' or link.href.startswith('magnet:'):
-                                    if link.href not in self.history:
-                                        self.client.console.print(f"[bold green]RSS Match:[/] '{entry.title}' - adding torrent.")
-                                        logging.info(f"RSS match found: '{entry.title}' from {feed_info['url']}")
-                                        self.client.add_torrent(link.href)
-                                        self.history.add(link.href)
-                                        self._save_state()
-                                    break
-                except Exception as e:
-                    logging.error(f"Failed to parse RSS feed {feed_info['url']}: {e}")
-            
-            self.shutdown_event.wait(15 * 60) # Check every 15 minutes
+        # One event loop for the lifetime of the RSS thread; fetches are async, everything else stays synchronous
+        loop = asyncio.new_event_loop() if AIOHTTP_AVAILABLE else None
+        try:
+            while not self.shutdown_event.is_set():
+                self._poll_due(loop)
+        finally:
+            if loop: loop.close()
+
+    def _poll_due(self, loop):
+        now = time.time()
+        due = [f for f in self.feeds if now >= f.get('next_check_at', 0)]
+        if due:
+            logging.info(f"Checking {len(due)} RSS feed(s)...")
+            # Fetching is I/O-bound, so overlap it; matching and seen-set updates stay on this thread
+            if loop: results = loop.run_until_complete(self._fetch_all(due))
+            else:
+                with ThreadPoolExecutor(max_workers=min(RSS_MAX_WORKERS, len(due))) as ex:
+                    results = list(ex.map(self._fetch_feed, due))
+            now = time.time()
+            # Feed dicts gain keys here; hold the lock so a main-thread snapshot never iterates them mid-update
+            with self._state_lock:
+                for feed_info, feed in zip(due, results):
+                    # 304 Not Modified: nothing new, keep the previous rate estimate
+                    if feed is not None and feed.get('status') != 304:
+                        # Validators only come from a successful response; a failed fetch must not clear them
+                        if self._fetch_ok(feed, feed_info['url']): feed_info['etag'], feed_info['modified'] = feed.get('etag'), feed.get('modified')
+                        self._process_feed(feed_info, feed)
+                        feed_info['recent_count'] = self._count_recent(feed, now)
+                    self._schedule(feed_info, now)
+                self._journal([{'sched': f['url'], **{k: f.get(k) for k in self.SCHEDULE_KEYS}} for f in due])
+
+        # Sleep until the earliest feed is due; newly added feeds are picked up within RSS_MIN_INTERVAL
+        next_due = min((f['next_check_at'] for f in self.feeds if 'next_check_at' in f), default=now + RSS_MIN_INTERVAL)
+        self.shutdown_event.wait(max(1, min(next_due - time.time(), RSS_MIN_INTERVAL)))
+
+    @staticmethod
+    def _count_recent(feed, now: float) -> int:
+        count = 0 # Entries published within RSS_RATE_WINDOW; undated entries are ignored
+        for entry in feed.entries:
+            published = entry.get('published_parsed') or entry.get('updated_parsed')
+            if published and now - calendar.timegm(published) <= RSS_RATE_WINDOW: count += 1
+        return count
+
+    @staticmethod
+    def _schedule(feed_info, now: float):
+        # Busy feeds are polled more often, dormant ones back off towards RSS_MAX_INTERVAL
+        count = feed_info.get('recent_count', 0)
+        interval = RSS_RATE_WINDOW / count if count else RSS_MAX_INTERVAL
+        interval = max(RSS_MIN_INTERVAL, min(interval, RSS_MAX_INTERVAL))
+        feed_info['next_check_at'] = now + interval + random.uniform(0, RSS_JITTER)
+
+    @staticmethod
+    def _fetch_ok(feed, url: str) -> bool:
+        # feedparser doesn't raise on network/HTTP errors: it returns a bozo result with no status or a 4xx/5xx
+        status = feed.get('status')
+        if status is not None: return status < 400
+        if url.startswith(('http://', 'https://')): return False
+        # Local paths never carry a status; only a bozo result with nothing parsed counts as a failure
+        return not (feed.get('bozo') and not feed.get('entries'))
+
+    def _fetch_feed(self, feed_info):
+        try:
+            # Conditional GET; unchanged feeds come back as an empty 304
+            feed = feedparser.parse(feed_info['url'], etag=feed_info.get('etag'), modified=feed_info.get('modified'))
+        except Exception as e:
+            logging.error(f"Failed to parse RSS feed {feed_info['url']}: {e}")
+            return None
+        if not self._fetch_ok(feed, feed_info['url']):
+            # Treated as a failure so the feed keeps its previous rate estimate
+            logging.error(f"Failed to fetch RSS feed {feed_info['url']}: status={feed.get('status')} {feed.get('bozo_exception', '')}")
+            return None
+        return feed
+
+    async def _fetch_all(self, feeds):
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=RSS_FETCH_TIMEOUT)) as http:
+            return await asyncio.gather(*(self._fetch_feed_async(http, f) for f in feeds))
+
+    async def _fetch_feed_async(self, http, feed_info):
+        # Same contract as _fetch_feed: a parsed feed carrying status/etag/modified, or None on failure
+        headers = {}
+        if feed_info.get('etag'): headers['If-None-Match'] = feed_info['etag']
+        if feed_info.get('modified'): headers['If-Modified-Since'] = feed_info['modified']
+        try:
+            async with http.get(feed_info['url'], headers=headers) as resp:
+                if resp.status == 304: return {'status': 304}
+                resp.raise_for_status()
+                body = await resp.read()
+                response_headers = {k.lower(): v for k, v in resp.headers.items()} # Lets feedparser pick the encoding
+            feed = feedparser.parse(body, response_headers=response_headers)
+            feed['status'], feed['etag'], feed['modified'] = resp.status, resp.headers.get('ETag'), resp.headers.get('Last-Modified')
+            return feed
+        except Exception as e:
+            logging.error(f"Failed to parse RSS feed {feed_info['url']}: {e}")
+            return None
+
+    def _process_feed(self, feed_info, feed):
+        try:
+            for entry in feed.entries:
+                if feed_info['_rx'].search(entry.title):
+                    for link in entry.links:
+                        if link.get('type') == 'application/x-bittorrent' or link.href.startswith('magnet:'):
+                            key = self._seen_key(link.href)
+                            if key not in self.seen:
+                                self.client.console.print(f"[bold green]RSS Match:[/] '{entry.title}' - adding torrent.")
+                                logging.info(f"RSS match found: '{entry.title}' from {feed_info['url']}")
+                                self.client.add_torrent(link.href)
+                                with self._state_lock:
+                                    self.seen.add(key)
+                                    self._journal([{'add': link.href}])
+                            break
+        except Exception as e:
+            logging.error(f"Failed to process RSS feed {feed_info['url']}: {e}")
 
     def start(self):
         self.thread.start()
@@ -180,7 +386,17 @@ class TorrentClient:
         self.console = Console()
         self.session = lt.session()
         self.handles = []
+        self.status_cache: Dict[lt.sha1_hash, lt.torrent_status] = {} # Filled from state_update_alert
+        self.status_dirty = threading.Event() # Set when the status table needs rebuilding
+        self.on_status_change = None # UI hook called from the alert thread to push a redraw
         self.shutdown_event = threading.Event()
+        self._alerts_ready = threading.Event()
+        self._pending_saves = 0 # Outstanding save_resume_data() requests, guarded by _saves_lock
+        self._saves_lock = threading.Lock()
+        self._saves_done = threading.Event()
+        self._shutting_down = False
+        self.session.set_alert_notify(self._on_alerts_ready) # Register exactly once; re-registering can deadlock
+        self._pending_settings = {} # Config key -> raw value, staged by 'config set', flushed by 'config apply'
         self._load_state_and_config() # Load first
         self.session.apply_settings(self.settings) # Apply loaded/default settings
         self.alert_thread = threading.Thread(target=self._alert_loop, daemon=True)
@@ -193,10 +409,10 @@ class TorrentClient:
     def _load_state_and_config(self):
         self.settings = { 'user_agent': 'TClient/Pro (libtorrent/2.0)' }
         try:
-            with open(SESSION_STATE_FILE, 'rb') as f:
-                state = lt.bdecode(f.read())
-                self.settings.update(state.get(b'settings', {}))
-                self.session.load_state(lt.bencode(state))
+            with open(SESSION_STATE_FILE, 'rb') as f: raw = f.read()
+            state = lt.bdecode(raw) # Decoded once; the same entry feeds both the settings and load_state
+            self.settings.update(state.get(b'settings', {}))
+            self.session.load_state(state)
             logging.info("Session state loaded.")
         except Exception:
             logging.warning("No session state found, using defaults.")
@@ -212,44 +428,106 @@ class TorrentClient:
         self.alert_thread.start()
         if self.rss_manager: self.rss_manager.start()
 
-        # Load torrents *after* session is configured and running
-        for filename in os.listdir(RESUME_DATA_DIR):
-            if filename.endswith('.fastresume'):
-                try:
-                    with open(os.path.join(RESUME_DATA_DIR, filename), 'rb') as f:
-                        params = lt.read_resume_data(f.read())
-                    params.save_path = SAVE_PATH
-                    self.session.async_add_torrent(params)
-                except Exception as e: logging.error(f"Error loading {filename}: {e}")
+        # Load torrents *after* session is configured and running.
+        # Reads and parses run in parallel; the adds are then submitted back-to-back from this thread.
+        with os.scandir(RESUME_DATA_DIR) as it:
+            entries = [e for e in it if e.name.endswith('.fastresume')]
+        if entries:
+            with ThreadPoolExecutor(max_workers=min(RESUME_MAX_WORKERS, len(entries))) as ex:
+                loaded = list(ex.map(self._read_resume_file, entries))
+            for params in loaded:
+                if params is not None: self.session.async_add_torrent(params)
+
+    @staticmethod
+    def _read_resume_file(entry: os.DirEntry):
+        try:
+            with open(entry.path, 'rb') as f:
+                params = lt.read_resume_data(f.read())
+            params.save_path = SAVE_PATH
+            return params
+        except Exception as e:
+            logging.error(f"Error loading {entry.name}: {e}")
+            return None
 
     # ... (alert loop, shutdown, add/remove torrents, etc. from previous version) ...
     # (The following methods are condensed for brevity, but are complete in the final script)
 
+    def _on_alerts_ready(self):
+        # Invoked on a libtorrent thread: only signal, never call back into the session from here
+        self._alerts_ready.set()
+
     def _alert_loop(self):
+        next_post = time.monotonic()
         while not self.shutdown_event.is_set():
-            if self.session.wait_for_alert(500):
-                for alert in self.session.pop_alerts():
-                    if isinstance(alert, lt.add_torrent_alert) and alert.error.value() == 0:
-                        h = alert.handle; h.set_flags(lt.torrent_flags.auto_managed); self.handles.append(h)
-                        logging.info(f"Torrent added: {alert.torrent_name()}")
-                    elif isinstance(alert, lt.save_resume_data_alert):
-                        h = alert.handle; resume_data = lt.write_resume_data_buf(alert.params)
-                        with open(os.path.join(RESUME_DATA_DIR, f"{h.info_hash()}.fastresume"), 'wb') as f: f.write(resume_data)
-                    elif isinstance(alert, (lt.dht_immutable_item_alert, lt.dht_mutable_item_alert)):
-                        self.console.print(f"[bold green]DHT GET Response:[/] {alert.item.value()}")
-                    elif isinstance(alert, lt.torrent_log_alert):
-                        logging.debug(f"[{alert.torrent_name()}] {alert.log_message()}")
+            if time.monotonic() >= next_post:
+                self.session.post_torrent_updates() # Answered by a state_update_alert carrying only changed torrents
+                next_post = time.monotonic() + STATUS_UPDATE_INTERVAL
+            self._alerts_ready.clear() # Clear before popping so a notify arriving mid-batch isn't lost
+            for alert in self.session.pop_alerts():
+                if isinstance(alert, lt.add_torrent_alert) and alert.error.value() == 0:
+                    h = alert.handle; h.set_flags(lt.torrent_flags.auto_managed); self.handles.append(h)
+                    logging.info(f"Torrent added: {alert.torrent_name()}")
+                    self._mark_status_changed()
+                elif isinstance(alert, lt.state_update_alert):
+                    for st in alert.status: self.status_cache[st.handle.info_hash()] = st
+                    if alert.status: self._mark_status_changed()
+                elif isinstance(alert, lt.save_resume_data_alert):
+                    h = alert.handle; resume_data = lt.write_resume_data_buf(alert.params)
+                    _atomic_write(os.path.join(RESUME_DATA_DIR, f"{h.info_hash()}.fastresume"), resume_data)
+                    self._resume_save_finished()
+                elif isinstance(alert, lt.save_resume_data_failed_alert):
+                    logging.warning(f"Saving resume data failed for {alert.torrent_name()}: {alert.message()}")
+                    self._resume_save_finished()
+                elif isinstance(alert, (lt.dht_immutable_item_alert, lt.dht_mutable_item_alert)):
+                    self.console.print(f"[bold green]DHT GET Response:[/] {alert.item.value()}")
+                elif isinstance(alert, lt.torrent_log_alert):
+                    logging.debug(f"[{alert.torrent_name()}] {alert.log_message()}")
+            self._alerts_ready.wait(max(0, next_post - time.monotonic()))
+
+    def _mark_status_changed(self):
+        self.status_dirty.set()
+        callback = self.on_status_change
+        if callback:
+            # Runs on the alert thread; a rendering error must never take the alert loop down with it
+            try: callback()
+            except Exception: logging.exception("Status redraw failed.")
+
+    def _resume_save_finished(self):
+        with self._saves_lock:
+            if self._pending_saves > 0:
+                self._pending_saves -= 1
+                if self._pending_saves == 0: self._saves_done.set()
 
     def shutdown(self):
+        # Signal handler and main's finally can both get here, possibly mid-shutdown (Ctrl-C during the save wait)
+        if self._shutting_down: return
+        self._shutting_down = True
+        if self._pending_settings:
+            self.console.print(f"[yellow]Discarding staged config changes (never applied): {', '.join(self._pending_settings)}[/]")
+            logging.warning(f"Discarded unapplied config changes: {self._pending_settings}")
         self.console.print("\n[bold yellow]Shutting down...[/]")
-        if self.rss_manager: self.rss_manager.shutdown()
-        self.shutdown_event.set()
-        with open(SESSION_STATE_FILE, 'wb') as f: f.write(self.session.save_state())
-        for h in self.handles:
-            if h.is_valid() and h.has_metadata(): h.save_resume_data()
-        # Await save_resume_data alerts...
-        time.sleep(2) # Simple wait, a more robust solution would count outstanding saves
-        if self.alert_thread.is_alive(): self.alert_thread.join()
+        try:
+            # Resume data first: nothing below may prevent these requests from going out
+            to_save = [h for h in self.handles if h.is_valid() and h.has_metadata()]
+            with self._saves_lock:
+                self._pending_saves = len(to_save) # Counted before requesting so an early alert can't underflow
+                self._saves_done.clear()
+            for h in to_save: h.save_resume_data()
+
+            # The rest of the state is written while the alert thread handles the resume alerts
+            try:
+                if self.rss_manager: self.rss_manager.shutdown()
+            except Exception: logging.exception("Failed to shut down RSSManager cleanly.")
+            try: _atomic_write(SESSION_STATE_FILE, lt.bencode(self.session.save_state())) # save_state() returns an entry (dict)
+            except Exception: logging.exception("Failed to save session state.")
+
+            # The alert thread is still running and counts down as each resume file is written
+            if to_save and not self._saves_done.wait(SHUTDOWN_SAVE_TIMEOUT):
+                logging.warning(f"Timed out waiting for resume data ({self._pending_saves} outstanding).")
+        finally:
+            self.shutdown_event.set()
+            self._alerts_ready.set() # Wake the alert thread so it sees the shutdown
+            if self.alert_thread.is_alive(): self.alert_thread.join()
         logging.info("TClient shut down gracefully.")
         self.console.print("[bold green]Shutdown complete.[/]")
 
@@ -281,12 +559,17 @@ class TorrentClient:
         if not os.path.exists(path):
             self.console.print(f"[red]IP filter file not found: {path}[/]"); return
         ipf = lt.ip_filter()
-        with open(path, 'r') as f:
-            for line in f:
-                parts = line.strip().split('-')
-                if len(parts) == 2:
-                    start, end = parts[0].strip(), parts[1].split('#')[0].strip()
-                    ipf.add_rule(start, end, lt.ip_filter.blocked)
+        add_rule, blocked = ipf.add_rule, lt.ip_filter.blocked # Hoisted out of the per-line loop
+        with open(path, 'rb') as f: data = f.read().decode('ascii', 'ignore')
+        for line in data.splitlines():
+            line = line.strip()
+            if not line or line[0] == '#': continue
+            dash = line.find('-')
+            if dash < 0: continue
+            end = line[dash + 1:]
+            hash_i = end.find('#')
+            if hash_i >= 0: end = end[:hash_i]
+            add_rule(line[:dash].strip(), end.strip(), blocked)
         self.session.set_ip_filter(ipf)
         self.console.print(f"[green]IP filter loaded from {path}.[/]")
 
@@ -298,6 +581,20 @@ class TorrentClient:
         self.session.dht_get_item(lt.sha1_hash(ihash))
         self.console.print(f"Requesting item from DHT: {ihash}")
 
+    def pause_torrent(self, index: int):
+        h = self._get_handle(index)
+        if h:
+            h.unset_flags(lt.torrent_flags.auto_managed) # Otherwise the queue would resume it again
+            h.pause()
+            self.console.print(f"Torrent {index} paused.")
+
+    def resume_torrent(self, index: int):
+        h = self._get_handle(index)
+        if h:
+            h.set_flags(lt.torrent_flags.auto_managed)
+            h.resume()
+            self.console.print(f"Torrent {index} resumed.")
+
     def toggle_super_seeding(self, index: int, enable: bool):
         h = self._get_handle(index)
         if h:
@@ -314,33 +611,63 @@ class TorrentClient:
                 self.console.print(f"Torrent {index} moved {action} in queue.")
 
     def set_share_ratio(self, index: int, ratio: float):
+        if not (math.isfinite(ratio) and ratio >= 0):
+            self.console.print(f"[red]Invalid share ratio: {ratio}, expected a non-negative number.[/]"); return
         h = self._get_handle(index)
         if h:
-            h.set_share_mode(lt.share_mode_t.share_mode_ratio)
-            h.set_ratio(ratio)
-            self.console.print(f"Share ratio for torrent {index} set to {ratio}.")
-
-    def config_set(self, key, value):
+            # set_ratio is deprecated; libtorrent's seed criteria use the session-wide share_ratio_limit (percent)
+            h.set_share_mode(_SM_RATIO)
+            limit = min(round(ratio * 100), C_INT_MAX) # The setting is a C int
+            self.settings['share_ratio_limit'] = limit
+            self.session.apply_settings({'share_ratio_limit': limit})
+            self.console.print(f"Torrent {index} now seeds to the share ratio limit, set to {ratio} (applies to all torrents).")
+
+    def _parse_config(self, key, value):
+        # Returns the libtorrent settings for one config key, or None (after reporting) if invalid
         if key not in self.CONFIG_MAP:
-            self.console.print(f"[red]Unknown config key: {key}[/]"); return
+            self.console.print(f"[red]Unknown config key: {key}[/]"); return None
         
         lt_key, v_type, _ = self.CONFIG_MAP[key]
         try:
             if v_type == int: final_value = int(value)
             else: final_value = value
-            
-            if key == 'cache_size_mb': final_value *= 64 # Convert MB to 16KiB blocks
-            elif key.endswith('_kb'): final_value *= 1024
-            elif key == 'encryption':
-                emap = {'enable': 1, 'force': 2, 'disable': 0}
-                final_value = emap.get(value, 1)
-                self.settings['pe_out_mode'] = final_value # Set both in and out
-
-            self.settings[lt_key] = final_value
-            self.session.apply_settings({lt_key: final_value})
-            self.console.print(f"[green]Config '{key}' set to '{value}'.[/]")
         except ValueError:
-            self.console.print(f"[red]Invalid value type for {key}, expected {v_type.__name__}.[/]")
+            self.console.print(f"[red]Invalid value type for {key}, expected {v_type.__name__}.[/]"); return None
+            
+        if key == 'cache_size_mb': final_value *= 64 # Convert MB to 16KiB blocks
+        elif key.endswith('_kb'): final_value *= 1024
+        elif key == 'encryption':
+            emap = {'enable': 1, 'force': 2, 'disable': 0}
+            final_value = emap.get(value, 1)
+            return {lt_key: final_value, 'pe_out_mode': final_value} # Set both in and out
+        return {lt_key: final_value}
+
+    def config_set(self, key, value):
+        self.config_set_many([(key, value)])
+
+    def config_set_many(self, pairs):
+        # All valid pairs go to libtorrent in a single apply_settings call
+        changes = {}
+        for key, value in pairs:
+            parsed = self._parse_config(key, value)
+            if parsed is not None:
+                changes.update(parsed)
+                self.console.print(f"[green]Config '{key}' set to '{value}'.[/]")
+        if changes:
+            self.settings.update(changes)
+            self.session.apply_settings(changes)
+
+    def config_stage(self, key, value):
+        if self._parse_config(key, value) is not None: # Validate now so 'apply' doesn't surprise
+            self._pending_settings[key] = value
+            self.console.print(f"[cyan]Config '{key}' staged as '{value}'. Use 'config apply' to commit.[/]")
+
+    def config_apply(self):
+        if not self._pending_settings:
+            self.console.print("[yellow]No pending config changes.[/]"); return
+        pairs = list(self._pending_settings.items())
+        self._pending_settings.clear()
+        self.config_set_many(pairs)
 
     def config_show(self):
         table = Table(title="Configuration")
@@ -360,21 +687,26 @@ class TorrentClient:
         table.add_column("Progress", width=30); table.add_column("Down ↓"); table.add_column("Up ↑");
         table.add_column("Peers"); table.add_column("Status")
 
-        sorted_handles = sorted(self.handles, key=lambda h: h.status().queue_position)
+        # Until every torrent has had a state_update_alert, fill the gaps with one batched query
+        if len(self.status_cache) < len(self.handles):
+            for st in self.session.get_torrent_status(lambda st: True): self.status_cache[st.handle.info_hash()] = st
         
-        for i, h in enumerate(sorted_handles):
-            s = h.status()
-            progress = Progress(TextColumn("{task.percentage:>3.1f}%"), BarColumn(), expand=True)
-            progress.add_task("p", total=100, completed=s.progress * 100)
-            status_str, color = get_status_string(s)
+        for i, s in enumerate(sorted(self.status_cache.values(), key=lambda s: s.queue_position)):
+            # Each torrent_status attribute is a boost::python descriptor call; read every field once
+            state, qp, prog, tw = s.state, s.queue_position, s.progress, s.total_wanted
+            status_str, color = get_status_string(state, s.flags, s.paused)
             
-            q_pos = f"[Q:{s.queue_position}]" if s.queue_position >= 0 and s.state != lt.torrent_status.states.seeding else ""
-            ratio = f" (R:{s.ratio:.1f})" if s.share_mode == lt.share_mode_t.share_mode_ratio else ""
-            status_text = f"{status_str}{q_pos}{ratio}"
+            q_pos = f"[Q:{qp}]" if qp >= 0 and state != _SEEDING else ""
+            status_text = f"{status_str}{q_pos}"
             
-            table.add_row(str(i), s.name, human_readable_size(s.total_wanted), progress, format_speed(s.download_rate),
+            table.add_row(str(i), s.name, human_readable_size(tw), progress_bar(prog), format_speed(s.download_rate),
                           format_speed(s.upload_rate), f"{s.num_peers}({s.num_seeds})", Text(status_text, style=color))
 
+        table.caption = self.get_status_caption()
+        return table
+
+    def get_status_caption(self) -> str:
+        # Session-wide figures; kept separate so the UI can refresh them without rebuilding the rows
         s_stats = self.session.status()
         settings = self.session.get_settings()
         
@@ -383,10 +715,25 @@ class TorrentClient:
         if self.session.get_ip_filter().access(lt.make_address("8.8.8.8")) & 1: icons += "🛡️" # Check if a known public IP is blocked
         if self.rss_manager and self.rss_manager.thread.is_alive(): icons += "📰"
         
-        table.caption = (f"[bold]DL[/]: {format_speed(s_stats.payload_download_rate)} "
-                         f"| [bold]UL[/]: {format_speed(s_stats.payload_upload_rate)} "
-                         f"| [bold]DHT[/]: {s_stats.dht_nodes} | {icons}")
-        return table
+        return (f"[bold]DL[/]: {format_speed(s_stats.payload_download_rate)} "
+                f"| [bold]UL[/]: {format_speed(s_stats.payload_upload_rate)} "
+                f"| [bold]DHT[/]: {s_stats.dht_nodes} "
+                f"| [bold]Ratio limit[/]: {settings.get('share_ratio_limit', 200) / 100:.2f} | {icons}")
+
+class StatusView:
+    # Live renderable that rebuilds the status rows only after the alert thread reports a change;
+    # the cheap caption (rates, DHT nodes) is refreshed on every render
+    def __init__(self, client: TorrentClient):
+        self.client = client
+        self._table = None
+
+    def __rich__(self) -> Table:
+        if self._table is None or self.client.status_dirty.is_set():
+            self.client.status_dirty.clear()
+            self._table = self.client.get_status_table()
+        else:
+            self._table.caption = self.client.get_status_caption()
+        return self._table
 
 # --- Main Execution ---
 def print_help(console):
@@ -398,7 +745,7 @@ def print_help(console):
 [cyan]info <#>[/]\t\t- Show details""", title="Manage", border_style="green"),
         Panel("""[bold]Queue & Ratio[/]
 [cyan]queue <#> <up|down|top|bottom>[/]
-[cyan]ratio <#> <float>[/]\t- Set share ratio
+[cyan]ratio <#> <float>[/]\t- Seed to ratio limit
 [cyan]conns <#> <max>[/]\t- Set max conns
 [cyan]superseed <#> on|off[/]""", title="Control", border_style="blue"),
         Panel("""[bold]Files & Pieces[/]
@@ -406,7 +753,7 @@ def print_help(console):
 [cyan]prio <#> file <f_idx> <0-7>[/]
 [cyan]prio <#> piece <p_idx> <0-7>[/]""", title="Prioritize", border_style="magenta"),
         Panel("""[bold]Network[/]
-[cyan]config set|show ...[/]\t- Tweak settings
+[cyan]config set|apply|show[/]\t- Tweak settings
 [cyan]ipfilter load <path>[/]\t- Load IP blocklist
 [cyan]dht put|get ...[/]\t- Use the DHT
 [cyan]proxy set|clear ...[/]""", title="Network", border_style="yellow"),
@@ -418,12 +765,61 @@ def print_help(console):
     console.print(Columns(panels))
     console.print("[bold cyan]help, q(uit), exit[/] are also available.")
 
+def split_command(line: str):
+    # Quote-aware like shlex.split, but with escapes off so regexes (\d, \.) and Windows paths keep their backslashes
+    lexer = shlex.shlex(line, posix=True)
+    lexer.whitespace_split = True
+    lexer.escape = ''
+    return list(lexer)
+
+def _subcommands(table, pos: int = 1):
+    # Handler that dispatches on the word at parts[pos], e.g. "config show" or "prio 0 file ..."
+    def handler(c, p):
+        if p[pos] not in table: raise ValueError(f"unknown subcommand '{p[pos]}'")
+        table[p[pos]](c, p)
+    return handler
+
+def _rss(c):
+    if c.rss_manager is None: raise ValueError("RSS is disabled (`feedparser` not installed)")
+    return c.rss_manager
+
+# Command word -> handler(client, parts); built once instead of walking an elif chain per command
+DISPATCH = {
+    "help": lambda c, p: print_help(c.console),
+    "add": lambda c, p: c.add_torrent(p[1]),
+    "pause": lambda c, p: c.pause_torrent(int(p[1])),
+    "resume": lambda c, p: c.resume_torrent(int(p[1])),
+    "queue": lambda c, p: c.queue_torrent(int(p[1]), p[2]),
+    "ratio": lambda c, p: c.set_share_ratio(int(p[1]), float(p[2])),
+    "superseed": lambda c, p: c.toggle_super_seeding(int(p[1]), p[2] == 'on'),
+    "prio": _subcommands({
+        'file': lambda c, p: c.set_torrent_file_priority(int(p[1]), int(p[3]), int(p[4])),
+        'piece': lambda c, p: c.set_torrent_piece_priority(int(p[1]), int(p[3]), int(p[4])),
+    }, pos=2),
+    "ipfilter": _subcommands({'load': lambda c, p: c.load_ip_filter(p[2])}),
+    "dht": _subcommands({
+        'put': lambda c, p: c.dht_put(" ".join(p[2:])),
+        'get': lambda c, p: c.dht_get(p[2]),
+    }),
+    "config": _subcommands({
+        'show': lambda c, p: c.config_show(),
+        'set': lambda c, p: c.config_stage(p[2], p[3]),
+        'apply': lambda c, p: c.config_apply(),
+    }),
+    "rss": _subcommands({
+        'add': lambda c, p: _rss(c).add_feed(p[2], " ".join(p[3:])),
+        'remove': lambda c, p: _rss(c).remove_feed(int(p[2])),
+        'list': lambda c, p: _rss(c).list_feeds(),
+    }),
+}
+
 def main():
     # ... signal handling and main loop setup ...
     client = TorrentClient()
     client.start()
     
     def signal_handler(sig, frame):
+        client.on_status_change = None # Stop alert-driven repaints while shutting down
         client.shutdown()
         sys.exit(0)
     signal.signal(signal.SIGINT, signal_handler)
@@ -432,33 +828,27 @@ def main():
     print_help(client.console)
 
     try:
-        with Live(client.get_status_table(), screen=True, redirect_stderr=False, refresh_per_second=2) as live:
+        # Redraws are pushed by the alert thread on change; the slow auto-refresh is just a fallback repaint
+        with Live(StatusView(client), screen=True, redirect_stderr=False, refresh_per_second=1) as live:
+            client.on_status_change = live.refresh
             while True:
-                live.update(client.get_status_table())
+                live.refresh()
                 cmd_input = Prompt.ask("[bold]tclient>[/]")
-                # ... This part becomes a very large command parser ...
-                # (A full implementation would be too long, but the structure is clear)
-                parts = cmd_input.split()
-                if not parts: continue
-                cmd = parts[0].lower()
                 try:
+                    parts = split_command(cmd_input) # Quoted paths and regexes stay a single argument
+                    if not parts: continue
+                    cmd = parts[0].lower()
                     if cmd in ("exit", "quit", "q"): break
-                    elif cmd == "help": print_help(client.console)
-                    elif cmd == "add": client.add_torrent(" ".join(parts[1:]))
-                    elif cmd == "pause": client.pause_torrent(int(parts[1]))
-                    elif cmd == "resume": client.resume_torrent(int(parts[1]))
-                    elif cmd == "config":
-                        if parts[1] == 'show': client.config_show()
-                        elif parts[1] == 'set': client.config_set(parts[2], parts[3])
-                    elif cmd == "rss":
-                        if parts[1] == 'add': client.rss_manager.add_feed(parts[2], " ".join(parts[3:]))
-                        elif parts[1] == 'remove': client.rss_manager.remove_feed(int(parts[2]))
-                        elif parts[1] == 'list': client.rss_manager.list_feeds()
-                    # ... many more elif statements for every command ...
+                    handler = DISPATCH.get(cmd)
+                    if handler: handler(client, parts)
                     else: client.console.print("[red]Unknown command.[/]")
                 except (IndexError, ValueError) as e:
                     client.console.print(f"[red]Invalid command or arguments: {e}[/]")
+                except Exception as e: # e.g. libtorrent RuntimeError; a bad command must not end the session
+                    logging.exception(f"Command failed: {cmd_input}")
+                    client.console.print(f"[red]Command failed: {e}[/]")
     finally:
+        client.on_status_change = None
         client.shutdown()
 
 if __name__ == "__main__":